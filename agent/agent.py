@@ -6,11 +6,23 @@ from typing import Dict, Any, List
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage
 from .instructions import sokoban_reflection_template
+from sokoban.sokoban_search import SokobanSearch
+from sokoban.sokoban_profiling import profile_section
 from langchain_core.callbacks import BaseCallbackHandler
 
 load_dotenv(override=True)
 logger = logging.getLogger("Sokoban-Agentic-Workflow")
 
+MIN_ROUNDS = 2
+MAX_ROUNDS = 8
+NO_PROGRESS_PATIENCE = 2
+ESCALATION_TEMPERATURE_STEP = 0.25
+ESCALATION_HINTS = {
+    "no-op plan": "Your last answer contained no valid moves. Answer with a numbered list of <U>, <D>, <L> or <R> moves.",
+    "repeated plan": "You already proposed this exact plan from this board. Do not repeat it; try a different route to the boxes.",
+    "no progress": "Your recent plans only led back to positions you had already reached (box distance is still {distance}). Try a different route to the boxes.",
+}
+
 
 def parse_direction(text: str) -> str | None:
     """Parse a single direction (U/D/L/R) from a line of text.
@@ -84,6 +96,99 @@ def convert_current_state_to_map(sokoban_game) -> str:
     return f"{game_map_str} \n {player} {box} {target}"
 
 
+def heuristic_distance(sokoban_game) -> int:
+    """Sum of Manhattan distances from every box to its nearest goal (0 when every box is on a goal)."""
+    goals = sokoban_game.level['goals']
+    return sum(min(abs(bx - gx) + abs(by - gy) for gx, gy in goals)
+               for bx, by in sokoban_game.game_state['boxes'])
+
+
+def is_level_completed(sokoban_game) -> bool:
+    """A level is solved once every goal holds a box; spare boxes may stay anywhere."""
+    return all(goal in sokoban_game.game_state['boxes'] for goal in sokoban_game.level['goals'])
+
+
+def is_deadlocked(sokoban_game, dead_cells) -> bool:
+    """Detect simple corner deadlocks: a box pushed into one of SokobanSearch.dead_cells can never reach a goal."""
+    return bool(dead_cells & sokoban_game.game_state['boxes'])
+
+
+def round_budget(sokoban_game) -> int:
+    """Number of reflection rounds allowed for a level, scaled by its free cells and box count."""
+    free_cells = sum(1 for row in sokoban_game.map_data for cell in row if cell not in ('#', 'x'))
+    num_boxes = len(sokoban_game.game_state['boxes'])
+    return max(MIN_ROUNDS, min(MAX_ROUNDS, 1 + 2 * num_boxes + free_cells // 25))
+
+
+class ReflectionController:
+    """Progress-aware stopping policy for the reflection loop.
+
+    After each round it records the board reached, its heuristic distance-to-goal
+    and the plan that was executed, and decides whether to continue, escalate
+    (retry with a hotter model and a corrective hint) or stop early because the
+    board is deadlocked, the model keeps repeating itself, or it keeps returning
+    to boards it has already reached.
+    """
+
+    CONTINUE = "continue"
+    ESCALATE = "escalate"
+    STOP = "stop"
+
+    def __init__(self, sokoban_game, max_rounds: int | None = None):
+        self.max_rounds = max_rounds if max_rounds is not None else round_budget(sokoban_game)
+        self.best_distance = heuristic_distance(sokoban_game)
+        self.rounds = 0
+        self.stale_rounds = 0
+        self.escalated = False
+        self.escalation_reason = None
+        self.seen_plans = set()
+        self.board = self.board_key(sokoban_game)
+        self.seen_boards = {self.board}
+        self.stop_reason = None
+        # Empty when there are more boxes than goals, since a cornered spare box is harmless
+        self.dead_cells = SokobanSearch(sokoban_game.DATA_FILE).dead_cells
+
+    @staticmethod
+    def board_key(sokoban_game):
+        return sokoban_game.game_state['player'], frozenset(sokoban_game.game_state['boxes'])
+
+    def update(self, plan: str, sokoban_game) -> str:
+        self.rounds += 1
+        distance = heuristic_distance(sokoban_game)
+        # A plan only repeats if it is replayed from the same board; short plans like "R"
+        # legitimately come back while pushing a box step by step
+        repeated = (self.board, plan) in self.seen_plans
+        self.seen_plans.add((self.board, plan))
+        self.board = self.board_key(sokoban_game)
+
+        # Walking the player towards a box is progress too, so any board not reached before counts
+        self.best_distance = min(self.best_distance, distance)
+        if self.board not in self.seen_boards:
+            self.seen_boards.add(self.board)
+            self.stale_rounds = 0
+        else:
+            self.stale_rounds += 1
+
+        if is_deadlocked(sokoban_game, self.dead_cells):
+            return self._stop("deadlock")
+        if self.rounds >= self.max_rounds:
+            return self._stop("budget")
+
+        if not plan or repeated or self.stale_rounds >= NO_PROGRESS_PATIENCE:
+            reason = "no-op plan" if not plan else "repeated plan" if repeated else "no progress"
+            if self.escalated:
+                return self._stop(reason)
+            self.escalated = True
+            self.escalation_reason = reason
+            self.stale_rounds = 0
+            return self.ESCALATE
+        return self.CONTINUE
+
+    def _stop(self, reason: str) -> str:
+        self.stop_reason = reason
+        return self.STOP
+
+
 def make_player_move(player_moving: str, sokoban_game) -> str:
     """Attempt to move the player in a specified direction in the Sokoban game."""
 
@@ -160,38 +265,58 @@ class SokobanAgentic:
         self.model_name = model_name
 
     async def sokoban_reflection_agent(self, sokoban_game: str, model_name: str, sokoban_rules) -> dict:
-        iterations = 0
-        MAX_ITERATIONS = 5
         LEVEL_COMPLETED = False
+        temperature = 0.5
+        hint = None
         sokoban_game_solution = []
         content = "Your task is to solve the sokoban game"
+        controller = ReflectionController(sokoban_rules)
 
         template_reflection_assist = sokoban_reflection_template(sokoban_game_state=sokoban_game)
 
-        generation_llm = ChatOllama(name="Sokoban-Assistant-Agent",
-                                    model=model_name,
-                                    callbacks=[AgentCallbackHandler()],
-                                    max_iterations=1,
-                                    temperature=0.5)
+        generation_llm = self.build_generation_llm(model_name, temperature)
 
         generation_chain = generation_llm
         messages = [HumanMessage(content=template_reflection_assist)]
 
-        while not LEVEL_COMPLETED and MAX_ITERATIONS >= iterations:
-            result = await generation_chain.ainvoke(messages)
+        while not LEVEL_COMPLETED:
+            with profile_section("llm_invoke"):
+                result = await generation_chain.ainvoke(messages)
 
-            current_state_map = convert_current_state_to_map(sokoban_rules)
-            sokoban_game_result = self.reflection_processing_moves(result.content, sokoban_game_solution, sokoban_rules)
-            sokoban_game_state = convert_current_state_to_map(sokoban_rules) + "\n" + sokoban_game_result
+            with profile_section("reflection_moves"):
+                current_state_map = convert_current_state_to_map(sokoban_rules)
+                sokoban_game_result = self.reflection_processing_moves(result.content, sokoban_game_solution, sokoban_rules)
+                sokoban_game_state = convert_current_state_to_map(sokoban_rules) + "\n" + sokoban_game_result
 
-            template_reflection_assist = sokoban_reflection_template(sokoban_game_state=current_state_map, sokoban_new_game_state=sokoban_game_state, new_state=True)
+            if "LEVEL_COMPLETED" in str(sokoban_game_result) or is_level_completed(sokoban_rules):
+                LEVEL_COMPLETED = True
+                break
+
+            decision = controller.update(sokoban_game_solution[-1], sokoban_rules)
+            if decision == ReflectionController.STOP:
+                logger.info(f"Reflection stopped early after {controller.rounds}/{controller.max_rounds} rounds: {controller.stop_reason}")
+                break
+            if decision == ReflectionController.ESCALATE:
+                temperature = min(1.0, temperature + ESCALATION_TEMPERATURE_STEP)
+                generation_chain = self.build_generation_llm(model_name, temperature)
+                hint = ESCALATION_HINTS[controller.escalation_reason].format(distance=controller.best_distance)
+                logger.info(f"Reflection escalated at round {controller.rounds} ({controller.escalation_reason}): temperature={temperature}")
+            else:
+                hint = None
+
+            template_reflection_assist = sokoban_reflection_template(sokoban_game_state=current_state_map, sokoban_new_game_state=sokoban_game_state, new_state=True, hint=hint)
             messages = [HumanMessage(content=template_reflection_assist)]
 
-            if "LEVEL_COMPLETED" in str(sokoban_game_result):
-                LEVEL_COMPLETED = True
-            iterations += 1
+        return {"answers": sokoban_game_solution, "content": content, "role": "assistant",
+                "stop_reason": "completed" if LEVEL_COMPLETED else controller.stop_reason,
+                "rounds": controller.rounds + int(LEVEL_COMPLETED)}
 
-        return {"answers": sokoban_game_solution, "content": content, "role": "assistant"}
+    def build_generation_llm(self, model_name: str, temperature: float) -> ChatOllama:
+        return ChatOllama(name="Sokoban-Assistant-Agent",
+                          model=model_name,
+                          callbacks=[AgentCallbackHandler()],
+                          max_iterations=1,
+                          temperature=temperature)
 
     def reflection_processing_moves(self, response, sokoban_game_solution, sokoban_rules) -> str:
         valid_steps = ""
@@ -78,7 +78,7 @@ def sokoban_assist_template(user_query:str, input:str, tools:str, tool_names:str
     """
     return sokoban_react_prompt
     
-def sokoban_reflection_template(sokoban_game_state:str, sokoban_new_game_state:str=None, new_state:bool=False) -> str:
+def sokoban_reflection_template(sokoban_game_state:str, sokoban_new_game_state:str=None, new_state:bool=False, hint:str=None) -> str:
       
     sokoban_baseline_prompt = f"""
         Context:
@@ -120,7 +120,10 @@ def sokoban_reflection_template(sokoban_game_state:str, sokoban_new_game_state:s
         2. Identify any mistakes, inefficiencies, or unexpected outcomes in the previous solution.
         3. Provide an improved, corrected, and optimized step-by-step solution to continue solving the puzzle from the current game state.
         4. Ensure the plan avoids deadlocks, unnecessary backtracking, and preserves solvability.
-        """   
+        """
+    if hint:
+        sokoban_reflect_prompt = f"{sokoban_reflect_prompt} \n        Note: {hint}\n"
+
     sokoban_prompt = f"{sokoban_reflect_prompt} \n {sokoban_baseline_prompt}" if new_state else f"{sokoban_normal_prompt} \n {sokoban_baseline_prompt}" 
     
     return sokoban_prompt
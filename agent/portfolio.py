@@ -0,0 +1,141 @@
+import time
+import atexit
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from graph.states import DEFAULT_STRATEGY_BUDGETS
+from sokoban.sokoban_tools import SokobanRules
+from sokoban.sokoban_search import solve_greedy, solve_astar
+from .agent import SokobanAgentic, make_player_move, convert_current_state_to_map, is_level_completed
+
+logger = logging.getLogger("Sokoban-Agentic-Workflow (SAW)")
+
+# The app is multi-threaded (Gradio, asyncio.to_thread), so worker processes must not be forked from it
+_mp_context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+_workers_lock = threading.Lock()
+_process_pool = None
+_process_manager = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared worker pool for the CPU-bound search strategies, created on first use."""
+    global _process_pool
+    with _workers_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=2, mp_context=_mp_context)
+        return _process_pool
+
+
+def new_cancel_event():
+    """Event that can be passed to a pool worker; plain multiprocessing Events cannot be pickled."""
+    global _process_manager
+    with _workers_lock:
+        if _process_manager is None:
+            _process_manager = _mp_context.Manager()
+        return _process_manager.Event()
+
+
+@atexit.register
+def shutdown_workers():
+    """Stop the search pool and the manager process behind the cancel events."""
+    global _process_pool, _process_manager
+    with _workers_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_manager is not None:
+            _process_manager.shutdown()
+            _process_manager = None
+
+
+def replay_moves(moves: str, test_file: str) -> tuple[bool, list[str], str]:
+    """Replay moves on a fresh board; return (solved, visited maps, moves up to completion)."""
+    sokoban_rules = SokobanRules(test_file)
+    visited_map_state = []
+    executed = ""
+
+    for move in moves:
+        move_result = make_player_move(player_moving=move, sokoban_game=sokoban_rules)
+        if "LEVEL_COMPLETED" in move_result:
+            break
+        if "VALID_MOVE" not in move_result:
+            return False, visited_map_state, executed
+        executed += move
+        visited_map_state.append(convert_current_state_to_map(sokoban_rules))
+
+    return is_level_completed(sokoban_rules), visited_map_state, executed
+
+
+class SokobanPortfolio:
+    """Races LLM reflection against greedy and A* search; the first verified solution wins."""
+
+    def __init__(self, sokobanAgentic: SokobanAgentic | None = None):
+        self.sokobanAgentic = sokobanAgentic or SokobanAgentic()
+
+    async def llm_strategy(self, test_file: str, model_name: str) -> str:
+        sokoban_rules = SokobanRules(test_file)
+        sokoban_game = convert_current_state_to_map(sokoban_rules)
+        result = await self.sokobanAgentic.sokoban_reflection_agent(sokoban_game=sokoban_game, model_name=model_name, sokoban_rules=sokoban_rules)
+        return "".join(result["answers"])
+
+    async def search_strategy(self, solver, test_file: str, budget: float) -> str | None:
+        """Run a search in the process pool.
+
+        The budget is enforced by the solver itself, so it only starts counting once
+        the job leaves the pool queue. On cancellation a queued job is dropped and a
+        running one is told to stop through the cancel event.
+        """
+        loop = asyncio.get_running_loop()
+        cancel_event = await asyncio.to_thread(new_cancel_event)
+        try:
+            return await loop.run_in_executor(get_process_pool(), solver, test_file, budget, cancel_event)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(cancel_event.set)
+            raise
+
+    async def run_strategy(self, name: str, test_file: str, model_name: str, budget: float) -> dict:
+        start_time = time.perf_counter()
+        if name == "llm":
+            try:
+                moves = await asyncio.wait_for(self.llm_strategy(test_file, model_name), timeout=budget)
+            except asyncio.TimeoutError:
+                moves = None
+                logger.info(f"Portfolio strategy '{name}' exceeded its budget of {budget}s")
+        elif name == "greedy":
+            moves = await self.search_strategy(solve_greedy, test_file, budget)
+        elif name == "astar":
+            moves = await self.search_strategy(solve_astar, test_file, budget)
+        else:
+            raise ValueError(f"Invalid strategy: {name}")
+
+        solved, visited_map_state, moves = replay_moves(moves, test_file) if moves is not None else (False, [], "")
+        latency = (time.perf_counter() - start_time) * 1000
+        return {"strategy": name, "solved": solved, "moves": moves, "visited_map_state": visited_map_state, "latency_ms": latency}
+
+    async def run(self, test_file: str, model_name: str, strategy_budgets: dict | None = None) -> dict:
+        """Launch every budgeted strategy, return the first verified solution and cancel the rest."""
+        budgets = strategy_budgets or DEFAULT_STRATEGY_BUDGETS
+        tasks = {asyncio.create_task(self.run_strategy(name, test_file, model_name, budget), name=name)
+                 for name, budget in budgets.items()}
+        winner = None
+        pending = tasks
+
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        logger.error(f"❌ Portfolio strategy '{task.get_name()}' failed: {task.exception()}")
+                        continue
+                    outcome = task.result()
+                    logger.info(f"Portfolio strategy '{outcome['strategy']}' finished | Solved: {outcome['solved']} | Duration: {outcome['latency_ms']:.2f} ms")
+                    if outcome["solved"] and (winner is None or outcome["latency_ms"] < winner["latency_ms"]):
+                        winner = outcome
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return winner or {"strategy": None, "solved": False, "moves": "", "visited_map_state": [], "latency_ms": None}
@@ -32,3 +32,14 @@ def route_after_executor_node(state: Dict[str, Any]) -> Literal[ "moves", "resul
     else:
         logger.warning(f"Unexpected status '{state['status']}', routing to result")
         return "result"
+
+
+def route_entry(state: Dict[str, Any]) -> Literal["moves", "portfolio"]:
+    """
+    Selects the first node of the workflow from the run mode:
+    the LLM reflection loop or the portfolio race of LLM and search strategies.
+    """
+    if state.get('mode') == "portfolio":
+        logger.info(f" 🏁 Portfolio mode | Budgets: {state['strategy_budgets']}")
+        return "portfolio"
+    return "moves"
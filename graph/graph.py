@@ -1,19 +1,27 @@
 import os
+import time
 import uuid
+import shutil
+import asyncio
 import logging
+import zipfile
+import tempfile
 from graph.states import SokobanState
 from graph.states import initiate_state
 from langgraph.graph import StateGraph, END
 from sokoban.sokoban_tools import SokobanRules
+from sokoban.sokoban_render import render_solution
 from langgraph.checkpoint.memory import InMemorySaver
 from agent.agent import convert_current_state_to_map
 
 from edges.edges import (
+    route_entry,
     route_after_executor_node,
 )
 from nodes.nodes import (
     move_node,
     executor_node,
+    portfolio_node,
     result_node,
 )
 
@@ -29,11 +37,18 @@ async def workflow_app(sql_memory = InMemorySaver()) -> StateGraph:
     # Add nodes
     workflow.add_node("moves", move_node)
     workflow.add_node("executor", executor_node)
+    workflow.add_node("portfolio", portfolio_node)
     workflow.add_node("result", result_node)
 
-    # set entry point to decomposition node
-    workflow.set_entry_point("moves")
+    # set entry point to decomposition node, or to the portfolio race
+    workflow.set_conditional_entry_point(route_entry,
+        {
+            "moves": "moves",
+            "portfolio": "portfolio",
+        }
+    )
     workflow.add_edge("moves", "executor")
+    workflow.add_edge("portfolio", "result")
     
     workflow.add_conditional_edges("executor", route_after_executor_node,
         {
@@ -51,45 +66,156 @@ async def workflow_app(sql_memory = InMemorySaver()) -> StateGraph:
 
     return graph
 
+BATCH_MAX_CONCURRENCY = 4
+BATCH_TABLE_HEADERS = ["Level", "Status", "Moves", "Latency (ms)", "Strategy"]
+RENDER_DIR = os.path.join(tempfile.gettempdir(), "sokoban_renders")
+
+
+def is_level_file(file_path: str) -> bool:
+    """Level files are .txt files; hidden files (e.g. macOS ._ metadata) are skipped."""
+    name = os.path.basename(file_path)
+    return name.endswith(".txt") and not name.startswith(".")
+
+
+def expand_uploaded_files(file_paths, extract_dir: str) -> list[str]:
+    """Resolve uploaded files (single, multiple or zip archives) into a sorted list of level files.
+
+    Zip archives are extracted into their own sub-folder of extract_dir. Only level
+    files are kept, both from archives and from files uploaded directly.
+    """
+    if not isinstance(file_paths, (list, tuple)):
+        file_paths = [file_paths]
+
+    level_files = []
+    for index, file_path in enumerate(file_paths):
+        file_path_str = getattr(file_path, "name", file_path)
+        if zipfile.is_zipfile(file_path_str):
+            archive_dir = os.path.join(extract_dir, str(index))
+            with zipfile.ZipFile(file_path_str) as archive:
+                archive.extractall(archive_dir)
+            for root, _, files in os.walk(archive_dir):
+                level_files.extend(os.path.join(root, name) for name in files if is_level_file(name))
+        elif is_level_file(file_path_str):
+            level_files.append(file_path_str)
+    return sorted(level_files)
+
+
 class SokobanChat:
-    def __init__(self):
+    def __init__(self, max_iterations: int = 1, max_concurrency: int = BATCH_MAX_CONCURRENCY, profile: bool = False):
         self.graph = None
         self.interaction_number = 0
         self.memory = InMemorySaver()
         self.sokobanChat_id = str(uuid.uuid4())
         self.file_path_upload = False
         self.uploaded_file_path = None
+        self.uploaded_file_paths = []
+        self.upload_dir = None
+        self.max_iterations = max_iterations
+        self.max_concurrency = max_concurrency
+        self.profile = profile
 
     async def setup(self):
         await self.build_graph()
 
     async def file_setup(self, file_path=None):
-        if file_path is None:
+        if not file_path:
             file_path_str = os.path.join(os.getcwd(), "dataset/test/1_3.txt")
             self.file_path_upload = False
+            self.uploaded_file_paths = [file_path_str]
         else:
-            file_path_str = file_path.name
+            # A new upload replaces the previous one, including its extracted archives
+            self.cleanup()
+            self.upload_dir = tempfile.mkdtemp(prefix=f"sokoban_batch_{self.sokobanChat_id}_")
+            self.uploaded_file_paths = expand_uploaded_files(file_path, self.upload_dir)
+            if not self.uploaded_file_paths:
+                self.file_path_upload = False
+                self.uploaded_file_path = None
+                return "⚠️ No Sokoban level (.txt) files found in the upload!"
+            file_path_str = self.uploaded_file_paths[0]
             self.file_path_upload = True
         self.uploaded_file_path = file_path_str
         sokoban_rules = SokobanRules(file_path_str)
-        return convert_current_state_to_map(sokoban_rules)
+        initial_map = convert_current_state_to_map(sokoban_rules)
+        if len(self.uploaded_file_paths) > 1:
+            initial_map = f"{len(self.uploaded_file_paths)} levels uploaded, first level ({sokoban_rules.data_file}): \n{initial_map}"
+        return initial_map
+
+    def cleanup(self):
+        """Remove the files extracted from uploaded zip archives of this session."""
+        if self.upload_dir is not None:
+            shutil.rmtree(self.upload_dir, ignore_errors=True)
+            self.upload_dir = None
 
     async def build_graph(self):
         self.graph = await workflow_app(self.memory)
 
-    async def run_superstep(self):
-        config = {"configurable": {"thread_id": self.sokobanChat_id}}
+    async def run_level(self, test_file: str, thread_id: str, mode: str = "reflection", strategy_budgets: dict = None) -> dict:
+        config = {"configurable": {"thread_id": thread_id}}
+        state = initiate_state(model_name="qwen3:latest", test_file=test_file, mode=mode,
+                               strategy_budgets=strategy_budgets, max_iterations=self.max_iterations,
+                               profile=self.profile)
+        self.interaction_number = state["max_iterations"]
+        return await self.graph.ainvoke(state, config=config)
 
+    async def run_superstep(self, mode: str = "reflection", strategy_budgets: dict = None):
         test_file = self.uploaded_file_path or os.path.join(os.getcwd(), "dataset/test/1_4.txt")
-        state = initiate_state(model_name="qwen3:latest", test_file=test_file)
-        self.interaction_number = state["max_iterations"]
-        result = await self.graph.ainvoke(state, config=config)
+        result = await self.run_level(test_file, self.sokobanChat_id, mode=mode, strategy_budgets=strategy_budgets)
         
         # This for nake sure that first response should be from final_response 
         visited_map_state = "\n ------ \n".join(result['visited_map_state'])
         if str(result['status']).lower() == ("success").lower():
-            final_response = f" Puzzle State: {visited_map_state}  \n ------ \n | 🔬 🚀 Congratulation 🚀 You solved the puzzle!  \n Puzzle Move: {result['moves']} \n"      
+            final_response = f" Puzzle State: {visited_map_state}  \n ------ \n | 🔬 🚀 Congratulation 🚀 You solved the puzzle!  \n Puzzle Move: {result['moves']} \n"
+            if result.get('winner'):
+                final_response += f" Winning strategy: {result['winner']} in {float(result['winner_latency_ms']):.2f} ms \n"
         else:
             final_response = f" Puzzle State: {visited_map_state}  \n ------ \n | 🔬 ⚠️ The AI fails to solve it. Try it later 🏄🏽!  \n Puzzle Move: {result['moves']} \n"
+
+        animation = None
+        try:
+            output_path = os.path.join(RENDER_DIR, f"{self.sokobanChat_id}.gif")
+            animation = await asyncio.to_thread(render_solution, test_file, result['moves'], output_path)
+        except Exception as e:
+            logger.warning(f"Could not render solution animation: {e}")
         
-        return {"role": "assistant", "content": final_response}
\ No newline at end of file
+        return {"role": "assistant", "content": final_response, "animation": animation}
+
+    async def run_batch(self, mode: str = "reflection", strategy_budgets: dict = None):
+        """
+        Run every uploaded level concurrently, each in its own graph thread,
+        bounded by a semaphore. Yields the progress table rows on every status change.
+        """
+        if self.profile and self.max_concurrency > 1:
+            logger.warning("Profiling a batch with max_concurrency > 1: overlapping levels are recorded as contended "
+                           "(wall time only, no .prof files). Use max_concurrency=1 for CPU/await profiles.")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        updates = asyncio.Queue()
+        progress = [[os.path.basename(test_file), "queued", "", None, ""] for test_file in self.uploaded_file_paths]
+
+        async def run_one(index: int, test_file: str):
+            row = progress[index]
+            async with semaphore:
+                row[1] = "running"
+                await updates.put(index)
+                start_time = time.perf_counter()
+                try:
+                    result = await self.run_level(test_file, f"{self.sokobanChat_id}-{index}", mode=mode, strategy_budgets=strategy_budgets)
+                    row[1], row[2], row[4] = result['status'], result['moves'], result.get('winner') or mode
+                except Exception as e:
+                    logger.error(f"❌ Batch level {row[0]} failed: {e}")
+                    row[1] = "error"
+                row[3] = round((time.perf_counter() - start_time) * 1000, 2)
+                await updates.put(index)
+
+        tasks = [asyncio.create_task(run_one(index, test_file)) for index, test_file in enumerate(self.uploaded_file_paths)]
+        try:
+            yield [list(row) for row in progress]
+            for _ in range(2 * len(tasks)):
+                await updates.get()
+                yield [list(row) for row in progress]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        solved = sum(1 for row in progress if row[1] == "success")
+        logger.info(f" 📝 Batch finished | Solved: {solved}/{len(progress)}")
@@ -4,9 +4,12 @@ Workflow nodes for the deep research Sokoban agent.
 This module contains all the node functions that implement the core
 logic of the agentic Sokoban workflow.
 """
-from typing import Optional, TypedDict, List
+from typing import Optional, TypedDict, List, Dict
 from sokoban.sokoban_tools import SokobanRules
 
+# Per-strategy time budgets (seconds) for portfolio mode
+DEFAULT_STRATEGY_BUDGETS = {"llm": 120.0, "greedy": 10.0, "astar": 60.0}
+
 class SokobanState(TypedDict):
     """
     State for Sokoban game agentic workflow and quality evaluation.
@@ -22,17 +25,27 @@ class SokobanState(TypedDict):
     visited_map_state: List[str]        # visited maps (serialized)
     previous_solution: List[str]        # previous solution
     final_response: Optional[str]       # final response
+    mode: str                           # "reflection" (LLM loop) or "portfolio" (race LLM and search)
+    strategy_budgets: Dict[str, float]  # per-strategy time budget in seconds for portfolio mode
+    winner: Optional[str]               # portfolio strategy that produced the verified solution
+    winner_latency_ms: Optional[float]  # time the winning strategy took
+    profile: bool                       # profile nodes of this run (also enabled by SOKOBAN_PROFILE=1)
     
-def initiate_state(model_name: str, test_file: str) -> SokobanState:
+def initiate_state(model_name: str, test_file: str, mode: str = "reflection", strategy_budgets: Optional[Dict[str, float]] = None, max_iterations: int = 1, profile: bool = False) -> SokobanState:
 
     return {
         "moves": "",                       
         "solution": "",
         "status": "continue",
-        "max_iterations": 1,
+        "max_iterations": max_iterations,
         "visited_map_state": [],
         "current_iteration": 0,
         "previous_solution": [],
         "test_file": test_file,
+        "mode": mode,
+        "strategy_budgets": strategy_budgets or dict(DEFAULT_STRATEGY_BUDGETS),
+        "winner": None,
+        "winner_latency_ms": None,
+        "profile": profile,
         "model_name": model_name #  gpt-oss:20b llama3:latest mistral:latest ollama3 qwen3 ayansh03/agribot
     }
\ No newline at end of file
@@ -8,11 +8,15 @@ import time
 import logging
 from graph.states import SokobanState
 from sokoban.sokoban_tools import SokobanRules
+from sokoban.sokoban_profiling import profiled_node
+from agent.portfolio import SokobanPortfolio
 from agent.agent import SokobanAgentic, make_player_move, convert_current_state_to_map
 
 logger = logging.getLogger("Sokoban-Agentic-Workflow (SAW)")
 sokobanAgentic = SokobanAgentic()
+sokobanPortfolio = SokobanPortfolio(sokobanAgentic)
 
+@profiled_node
 async def move_node(state: SokobanState) -> SokobanState:
     """
     Generates moves (sequence of primitive moves)
@@ -43,7 +47,7 @@ async def move_node(state: SokobanState) -> SokobanState:
             state['moves'] = plan_result
         
         refined_time = (time.perf_counter() - start_time) * 1000
-        logger.info(f"""📝 🔍 Move_NODE: Executed success full! Proposed Solution: {plan_result} | Inference Time: {float(refined_time):.2f} ms ✅""")
+        logger.info(f"""📝 🔍 Move_NODE: Executed success full! Proposed Solution: {plan_result} | Rounds: {result.get('rounds')} | Stop: {result.get('stop_reason')} | Inference Time: {float(refined_time):.2f} ms ✅""")
             
         return {**state,}
             
@@ -51,6 +55,7 @@ async def move_node(state: SokobanState) -> SokobanState:
         logger.error(f"❌ Moving NODE failed: {e}")
         return {**state, }
 
+@profiled_node
 async def executor_node(state: SokobanState) -> SokobanState: 
     """
     Executes the moves issued by plan.
@@ -103,6 +108,35 @@ async def executor_node(state: SokobanState) -> SokobanState:
         logger.error(f"❌ Executor NODE failed: {e}")
         return {**state, }
 
+@profiled_node
+async def portfolio_node(state: SokobanState) -> SokobanState:
+    """
+    Races the LLM reflection agent against greedy and A* search
+    and keeps the first verified solution.
+    """
+    try:
+        logger.info(f""" 🔀 🏁 Portfolio_NODE: Racing strategies {list(state['strategy_budgets'])} """)
+        state['current_iteration'] = state['current_iteration'] + 1
+        result = await sokobanPortfolio.run(test_file=state['test_file'], model_name=state['model_name'], strategy_budgets=state['strategy_budgets'])
+
+        state['moves'] = result['moves']
+        state['visited_map_state'] = result['visited_map_state']
+        state['winner'] = result['strategy']
+        state['winner_latency_ms'] = result['latency_ms']
+        if result['solved']:
+            state['status'] = "success"
+            state['solution'] = result['moves']
+            state['final_response'] = result['moves']
+            logger.info(f"""🔀 🏁 Portfolio_NODE: Winner: {result['strategy']} | Solution: {result['moves']} | Duration: {float(result['latency_ms']):.2f} ms ✅""")
+        else:
+            state['status'] = "unsolved"
+            logger.warning(f""" 🔀 🏁 Portfolio_NODE: No strategy solved the level within its budget""")
+
+        return {**state, }
+    except Exception as e:
+        logger.error(f"❌ Portfolio NODE failed: {e}")
+        return {**state, }
+
 async def result_node(state: SokobanState) -> SokobanState:
     """
     Record the running information to save to dataframe.
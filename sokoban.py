@@ -1,6 +1,6 @@
 import logging
 import gradio as gr
-from graph.graph import SokobanChat
+from graph.graph import SokobanChat, BATCH_TABLE_HEADERS
 
 logger = logging.getLogger("Sokoban-Agentic-Workflow (SAW)")
 
@@ -11,10 +11,11 @@ async def setup():
     return sokobanChat
 
 # Reset all setting of the Sokoban Game 
-async def cleanup():
+async def cleanup(sokobanChat = None):
+    free_resources(sokobanChat)
     new_sokobanChat = SokobanChat()
     await new_sokobanChat.setup()
-    return  new_sokobanChat, None, None, None
+    return  new_sokobanChat, None, None, None, None, None
 
 # Upload the file in the Sokoban Game 
 async def file_setup(sokobanChat, file_path = None):
@@ -22,14 +23,24 @@ async def file_setup(sokobanChat, file_path = None):
     return sokobanChat, results
 
 # Process the sokoban game file using AI Agentic and Agent Model
-async def process_sokoban_file(sokobanChat):
+async def process_sokoban_file(sokobanChat, mode = "reflection"):
     if not sokobanChat.file_path_upload:
-        return sokobanChat,  "#### ⚠️ Please upload the sokoban game file to Sokoban Assistant (SSA) AI first!"
-    results = await sokobanChat.run_superstep()
-    return sokobanChat, results["content"]
+        return sokobanChat,  "#### ⚠️ Please upload the sokoban game file to Sokoban Assistant (SSA) AI first!", None
+    results = await sokobanChat.run_superstep(mode=mode)
+    return sokobanChat, results["content"], results["animation"]
+
+# Process every uploaded sokoban game file concurrently, streaming a progress table
+async def process_sokoban_batch(sokobanChat, mode = "reflection"):
+    if not sokobanChat.file_path_upload:
+        gr.Warning("⚠️ Please upload the sokoban game file(s) to Sokoban Assistant (SSA) AI first!")
+        yield sokobanChat, None
+        return
+    async for rows in sokobanChat.run_batch(mode=mode):
+        yield sokobanChat, rows
 
 def free_resources(sokobanChat):
-    pass
+    if sokobanChat is not None:
+        sokobanChat.cleanup()
         
 with gr.Blocks(theme=gr.themes.Default(primary_hue="emerald")) as demo:
     gr.Markdown("## Sokoban Game Assistant Supporter ")
@@ -37,21 +48,28 @@ with gr.Blocks(theme=gr.themes.Default(primary_hue="emerald")) as demo:
     
     with gr.Row():
         # input_sokoban_game_file = gr.UploadButton(label = "Upload Sokoban Game File...!")
-        input_sokoban_game_file = gr.File(label = "Upload Sokoban Game File...!")
+        input_sokoban_game_file = gr.File(label = "Upload Sokoban Game File(s) or Zip...!", file_count="multiple")
         output_file = gr.Textbox(label="ℹ️ Sokoban Game Initial State!")
+        solver_mode = gr.Radio(["reflection", "portfolio"], value="reflection", label="🧭 Solver Mode")
     
     with gr.Row():
         sokoban_game_file_button = gr.Button("Sokoban Game File Saving...!", variant="primary")
         reset_button = gr.Button("❌ Reset", variant="stop")
         go_button = gr.Button("🚀 Submit", variant="primary")
+        batch_button = gr.Button("📦 Run All Levels", variant="primary")
            
     with gr.Row():
         chatbot = gr.Textbox(label= "📝 Game Assistant AI ✅ ") 
+        solution_animation = gr.Image(label="🎬 Solution Animation", type="filepath")
+
+    with gr.Row():
+        batch_progress = gr.Dataframe(headers=BATCH_TABLE_HEADERS, label="📊 Batch Progress", interactive=False)
 
     demo.load(setup, [], [sokobanChat])
     
     sokoban_game_file_button.click(fn=file_setup, inputs=[sokobanChat,input_sokoban_game_file], outputs=[sokobanChat, output_file])
-    go_button.click(fn=process_sokoban_file, inputs=[sokobanChat], outputs=[sokobanChat, chatbot])
-    reset_button.click(fn=cleanup, inputs=[], outputs=[sokobanChat, chatbot, input_sokoban_game_file, output_file])
+    go_button.click(fn=process_sokoban_file, inputs=[sokobanChat, solver_mode], outputs=[sokobanChat, chatbot, solution_animation])
+    batch_button.click(fn=process_sokoban_batch, inputs=[sokobanChat, solver_mode], outputs=[sokobanChat, batch_progress])
+    reset_button.click(fn=cleanup, inputs=[sokobanChat], outputs=[sokobanChat, chatbot, input_sokoban_game_file, output_file, batch_progress, solution_animation])
     
 demo.launch(share=True, auth=None)
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+
+logger = logging.getLogger("Sokoban-Agentic-Moving (SAM)")
+
+PROFILE_ENV = "SOKOBAN_PROFILE"
+PROFILE_DIR_ENV = "SOKOBAN_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+
+_current_profile: ContextVar["RunProfile | None"] = ContextVar("sokoban_run_profile", default=None)
+
+
+def profiling_enabled(state: dict) -> bool:
+    """Profiling is opt-in per run through state['profile'] or the SOKOBAN_PROFILE env var."""
+    return bool(state.get("profile")) or os.getenv(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+class RunProfile:
+    """Wall, CPU and await time of one node call, plus named sections recorded inside it.
+
+    await time is wall time minus CPU time of the event-loop thread, i.e. time spent
+    suspended on the model or the process pool. Both time.thread_time() and cProfile
+    measure the whole thread, so these numbers are only valid while no other profiled
+    node runs on the loop. A node call that overlaps another one is marked contended:
+    it keeps wall times only and writes no .prof/.folded files.
+    """
+
+    def __init__(self, thread_id: str, node_name: str):
+        self.thread_id = thread_id
+        self.node_name = node_name
+        self.sections = {}
+        self.contended = False
+        self.profiler = None
+
+    def add(self, name: str, wall: float, cpu: float):
+        section = self.sections.setdefault(name, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "await_ms": 0.0})
+        section["calls"] += 1
+        section["wall_ms"] += wall * 1000
+        section["cpu_ms"] += cpu * 1000
+        section["await_ms"] += max(0.0, wall - cpu) * 1000
+
+    def save(self, output_dir: str):
+        """Write <node>_<ms>.prof (cProfile), .folded (collapsed stacks) and append to timings.jsonl."""
+        run_dir = os.path.join(output_dir, str(self.thread_id))
+        os.makedirs(run_dir, exist_ok=True)
+        base_name = os.path.join(run_dir, f"{self.node_name}_{int(time.time() * 1000)}")
+
+        sections = self.sections
+        if self.contended:
+            # CPU of the other runs was charged to this one; only wall time is meaningful
+            sections = {name: {"calls": section["calls"], "wall_ms": section["wall_ms"]} for name, section in sections.items()}
+        elif self.profiler is not None:
+            self.profiler.dump_stats(f"{base_name}.prof")
+            write_collapsed_stacks(pstats.Stats(self.profiler), f"{base_name}.folded")
+
+        with open(os.path.join(run_dir, "timings.jsonl"), "a") as timings:
+            timings.write(json.dumps({"node": self.node_name, "contended": self.contended, "sections": sections}) + "\n")
+        return base_name
+
+
+# Profiled node calls currently running on the event loop
+_active_profiles: set[RunProfile] = set()
+
+
+@contextmanager
+def profile_section(name: str):
+    """Record wall and CPU time of a block into the active run profile; no-op when profiling is off."""
+    run_profile = _current_profile.get()
+    if run_profile is None:
+        yield
+        return
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        run_profile.add(name, time.perf_counter() - start_wall, time.thread_time() - start_cpu)
+
+
+def profiled_node(node_fn):
+    """Wrap an async workflow node so that opted-in runs are profiled per thread_id."""
+
+    @functools.wraps(node_fn)
+    async def wrapper(state, config=None):
+        if not profiling_enabled(state):
+            return await node_fn(state)
+
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id", "default")
+        run_profile = RunProfile(thread_id, node_fn.__name__)
+        if _active_profiles:
+            run_profile.contended = True
+            for other in _active_profiles:
+                other.contended = True
+        else:
+            try:
+                run_profile.profiler = cProfile.Profile()
+                run_profile.profiler.enable()
+            except ValueError:
+                # Another profiling tool owns the thread; keep the timings only
+                run_profile.profiler = None
+        _active_profiles.add(run_profile)
+        token = _current_profile.set(run_profile)
+
+        try:
+            with profile_section("node"):
+                return await node_fn(state)
+        finally:
+            if run_profile.profiler is not None:
+                run_profile.profiler.disable()
+            _active_profiles.discard(run_profile)
+            _current_profile.reset(token)
+            try:
+                base_name = run_profile.save(os.getenv(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR))
+                node = run_profile.sections["node"]
+                if run_profile.contended:
+                    logger.info(f"Profile {base_name} | Wall: {node['wall_ms']:.2f} ms | Contended with another profiled run, CPU split skipped")
+                else:
+                    logger.info(f"Profile {base_name} | Wall: {node['wall_ms']:.2f} ms | CPU: {node['cpu_ms']:.2f} ms | Await: {node['await_ms']:.2f} ms")
+            except OSError as e:
+                logger.warning(f"Could not save profile: {e}")
+
+    # LangGraph reads the signature to decide whether to pass config; expose the wrapper's own
+    del wrapper.__wrapped__
+    return wrapper
+
+
+def write_collapsed_stacks(stats: pstats.Stats, output_path: str, max_depth: int = 64):
+    """Convert cProfile stats into collapsed stacks ("a;b;c <microseconds>") for flamegraph tools.
+
+    cProfile only keeps caller/callee edges, so the time of a function called from
+    several places is split between its stacks in proportion to each edge.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, edge_cumtime) in callers.items():
+            callees.setdefault(caller, {})[func] = edge_cumtime
+
+    def label(func):
+        filename, lineno, name = func
+        return f"{name} ({os.path.basename(filename)}:{lineno})" if lineno else name
+
+    stacks = Counter()
+
+    def walk(func, path, scale):
+        _, _, tottime, cumtime, _ = stats.stats[func]
+        path = path + (func,)
+        self_us = int(tottime * scale * 1e6)
+        if self_us > 0:
+            stacks[";".join(label(f) for f in path)] += self_us
+        if len(path) >= max_depth:
+            return
+        for callee, edge_cumtime in callees.get(func, {}).items():
+            callee_cumtime = stats.stats[callee][3]
+            if callee in path or callee_cumtime <= 0 or edge_cumtime * scale * 1e6 < 1:
+                continue
+            walk(callee, path, scale * edge_cumtime / callee_cumtime)
+
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    with open(output_path, "w") as collapsed:
+        for stack, micros in stacks.items():
+            collapsed.write(f"{stack} {micros}\n")
@@ -0,0 +1,158 @@
+import os
+import logging
+import numpy as np
+import imageio.v2 as imageio
+from PIL import Image, GifImagePlugin
+from functools import lru_cache
+from sokoban.sokoban_search import SokobanSearch
+
+logger = logging.getLogger("Sokoban-Agentic-Moving (SAM)")
+
+TILE_SIZE = 16
+TILE_NAMES = ("floor", "wall", "goal", "box", "box_on_goal", "player", "player_on_goal")
+COLORS = {
+    "floor": (40, 44, 52),
+    "wall": (130, 72, 44),
+    "mortar": (90, 50, 30),
+    "goal": (220, 60, 60),
+    "box": (230, 170, 60),
+    "box_edge": (150, 100, 30),
+    "box_on_goal": (80, 190, 100),
+    "player": (70, 140, 230),
+}
+# Frames are kept as palette indices so GIF frames need no per-frame colour quantization
+COLOR_INDEX = {name: index for index, name in enumerate(COLORS)}
+PALETTE = np.array(list(COLORS.values()), dtype=np.uint8)
+
+
+@lru_cache(maxsize=8)
+def tile_atlas(tile_size: int = TILE_SIZE) -> np.ndarray:
+    """Build the tile atlas once per tile size: palette indices of shape (len(TILE_NAMES), tile_size, tile_size)."""
+    yy, xx = np.mgrid[:tile_size, :tile_size]
+    center = (tile_size - 1) / 2
+    radius = np.hypot(yy - center, xx - center)
+    inset = max(1, tile_size // 8)
+
+    atlas = np.empty((len(TILE_NAMES), tile_size, tile_size), dtype=np.uint8)
+    atlas[:] = COLOR_INDEX["floor"]
+
+    wall = atlas[TILE_NAMES.index("wall")]
+    wall[:] = COLOR_INDEX["wall"]
+    wall[::max(2, tile_size // 4), :] = COLOR_INDEX["mortar"]
+    wall[:, ::max(2, tile_size // 2)] = COLOR_INDEX["mortar"]
+
+    goal_mask = np.abs(yy - center) + np.abs(xx - center) <= tile_size / 5
+    for name in ("goal", "box_on_goal", "player_on_goal"):
+        atlas[TILE_NAMES.index(name)][goal_mask] = COLOR_INDEX["goal"]
+
+    box_mask = (yy >= inset) & (yy < tile_size - inset) & (xx >= inset) & (xx < tile_size - inset)
+    edge_mask = box_mask & ~((yy > inset) & (yy < tile_size - inset - 1) & (xx > inset) & (xx < tile_size - inset - 1))
+    for name in ("box", "box_on_goal"):
+        tile = atlas[TILE_NAMES.index(name)]
+        tile[box_mask] = COLOR_INDEX[name]
+        tile[edge_mask] = COLOR_INDEX["box_edge"]
+
+    player_mask = radius <= tile_size / 2 - inset
+    for name in ("player", "player_on_goal"):
+        atlas[TILE_NAMES.index(name)][player_mask] = COLOR_INDEX["player"]
+
+    atlas.setflags(write=False)
+    return atlas
+
+
+class SokobanRenderer:
+    """Renders a move sequence as an animation by blitting atlas tiles into a single frame buffer.
+
+    Only the cells that change between two moves (old/new player and pushed box)
+    are redrawn. GIF frames are encoded and written one at a time as just the
+    changed rectangle, so memory does not grow with the solution length.
+    """
+
+    def __init__(self, data_file, tile_size: int = TILE_SIZE):
+        self.search = SokobanSearch(data_file)
+        self.tile_size = tile_size
+        self.atlas = tile_atlas(tile_size)
+        height = len(self.search.map_data)
+        width = max(len(row) for row in self.search.map_data)
+        self.frame = np.empty((height * tile_size, width * tile_size), dtype=np.uint8)
+
+    def tile_index(self, cell, state) -> int:
+        player, boxes = state
+        x, y = cell
+        if self.search.is_wall(x, y):
+            return TILE_NAMES.index("wall")
+        on_goal = cell in self.search.goals
+        if cell in boxes:
+            return TILE_NAMES.index("box_on_goal" if on_goal else "box")
+        if cell == player:
+            return TILE_NAMES.index("player_on_goal" if on_goal else "player")
+        return TILE_NAMES.index("goal" if on_goal else "floor")
+
+    def blit(self, cell, state):
+        x, y = cell
+        ts = self.tile_size
+        self.frame[x * ts:(x + 1) * ts, y * ts:(y + 1) * ts] = self.atlas[self.tile_index(cell, state)]
+
+    def draw_full(self, state):
+        """Compose the whole board at once by fancy-indexing the atlas with the cell index grid."""
+        ts = self.tile_size
+        rows, cols = self.frame.shape[0] // ts, self.frame.shape[1] // ts
+        grid = np.array([[self.tile_index((x, y), state) for y in range(cols)] for x in range(rows)])
+        self.frame[:] = self.atlas[grid].transpose(0, 2, 1, 3).reshape(self.frame.shape)
+
+    def frames(self, moves: str):
+        """Yield (frame, dirty box) for the start and after every applied move, reusing one frame buffer.
+
+        The dirty box (top, left, bottom, right) in pixels bounds the redrawn cells.
+        Blocked or unknown moves are skipped; iteration stops once the level is solved.
+        """
+        state = self.search.start
+        self.draw_full(state)
+        yield self.frame, (0, 0) + self.frame.shape
+
+        ts = self.tile_size
+        for move in str(moves).upper():
+            if self.search.goals <= state[1]:
+                break
+            child = self.search.step(state, move) if move in "UDLR" else None
+            if child is None:
+                continue
+            cells = {state[0], child[0]} | (state[1] ^ child[1])
+            for cell in cells:
+                self.blit(cell, child)
+            state = child
+            rows, cols = [x for x, _ in cells], [y for _, y in cells]
+            yield self.frame, (min(rows) * ts, min(cols) * ts, (max(rows) + 1) * ts, (max(cols) + 1) * ts)
+
+    def render(self, moves: str, output_path: str, fps: int = 8) -> str:
+        """Stream the animation of moves to output_path (.gif or .mp4) and return the path."""
+        frame_count = 0
+
+        if output_path.endswith(".gif"):
+            duration = 1000 / fps
+            with open(output_path, "wb") as fp:
+                for frame, (top, left, bottom, right) in self.frames(moves):
+                    # Copy the dirty rectangle, since the shared frame buffer is overwritten by the next move
+                    patch = frame[top:bottom, left:right]
+                    image = Image.frombytes("P", (patch.shape[1], patch.shape[0]), patch.tobytes())
+                    image.putpalette(PALETTE.tobytes())
+                    if frame_count == 0:
+                        header, _ = GifImagePlugin.getheader(image, info={"loop": 0, "duration": duration, "optimize": False})
+                        fp.writelines(header)
+                    # disposal=1 keeps the previous frame so each patch is drawn on top of it
+                    fp.writelines(GifImagePlugin.getdata(image, offset=(left, top), duration=duration, disposal=1))
+                    frame_count += 1
+                fp.write(b";")
+        else:
+            with imageio.get_writer(output_path, mode="I", fps=fps, macro_block_size=1) as writer:
+                for frame, _ in self.frames(moves):
+                    frame_count += 1
+                    writer.append_data(PALETTE[frame])
+
+        logger.info(f"Rendered {frame_count} frames to {output_path}")
+        return output_path
+
+
+def render_solution(data_file, moves: str, output_path: str, tile_size: int = TILE_SIZE, fps: int = 8) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    return SokobanRenderer(data_file, tile_size=tile_size).render(moves, output_path, fps=fps)
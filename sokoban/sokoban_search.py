@@ -0,0 +1,122 @@
+import time
+import heapq
+import logging
+from itertools import count
+from sokoban.sokoban_tools import SokobanRules
+
+logger = logging.getLogger("Sokoban-Agentic-Moving (SAM)")
+
+# Same direction convention as agent.agent.make_player_move
+MOVE_OFFSETS = {"U": (0, -1), "D": (0, 1), "L": (-1, 0), "R": (1, 0)}
+
+
+class SokobanSearch:
+    """Classical best-first search over (player, boxes) states of a Sokoban level.
+
+    Kept free of any LLM dependency so the solvers can run inside worker
+    processes of a ProcessPoolExecutor.
+    """
+
+    def __init__(self, data_file):
+        sokoban_rules = SokobanRules(data_file)
+        self.map_data = sokoban_rules.map_data
+        self.goals = frozenset(sokoban_rules.level['goals'])
+        self.start = (sokoban_rules.game_state['player'], frozenset(sokoban_rules.game_state['boxes']))
+        # Corner pruning is only sound when every box must end up on a goal
+        self.dead_cells = set()
+        if len(self.start[1]) == len(self.goals):
+            self.dead_cells = {(x, y) for x in range(len(self.map_data)) for y in range(len(self.map_data[x]))
+                               if not self.is_wall(x, y) and self.is_corner(x, y)}
+
+    def is_wall(self, x, y):
+        if x < 0 or x >= len(self.map_data) or y < 0 or y >= len(self.map_data[x]):
+            return True
+        return self.map_data[x][y] in ('#', 'x')
+
+    def is_corner(self, x, y):
+        if (x, y) in self.goals:
+            return False
+        return (self.is_wall(x - 1, y) or self.is_wall(x + 1, y)) and (self.is_wall(x, y - 1) or self.is_wall(x, y + 1))
+
+    def heuristic(self, boxes) -> int:
+        return sum(min(abs(bx - gx) + abs(by - gy) for gx, gy in self.goals) for bx, by in boxes)
+
+    def step(self, state, move):
+        """Apply one move with the game rules; return the next state or None if it is blocked."""
+        (px, py), boxes = state
+        dx, dy = MOVE_OFFSETS[move]
+        tx, ty = px + dx, py + dy
+        if self.is_wall(tx, ty):
+            return None
+        if (tx, ty) in boxes:
+            bx, by = tx + dx, ty + dy
+            if self.is_wall(bx, by) or (bx, by) in boxes:
+                return None
+            return (tx, ty), boxes - {(tx, ty)} | {(bx, by)}
+        return (tx, ty), boxes
+
+    def successors(self, state):
+        for move in MOVE_OFFSETS:
+            child = self.step(state, move)
+            # Skip blocked moves and pushes that wedge a box into a dead corner
+            if child is None or (child[1] - state[1]) & self.dead_cells:
+                continue
+            yield move, child
+
+    def solve(self, greedy: bool = False, time_limit: float | None = None, cancel_event=None) -> str | None:
+        """Return the move string solving the level, or None if not found within time_limit seconds.
+
+        With greedy=True nodes are ordered by heuristic only (fast, not optimal);
+        otherwise by g + h, i.e. A* with an admissible box-distance heuristic.
+        The time limit starts when the search starts, and setting cancel_event
+        (e.g. a multiprocessing Event) stops it early.
+        """
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        tie = count()
+        start_h = self.heuristic(self.start[1])
+        frontier = [(start_h, next(tie), 0, self.start)]
+        parents = {self.start: None}
+        costs = {self.start: 0}
+        expanded = 0
+
+        while frontier:
+            expanded += 1
+            if expanded % 1024 == 0:
+                if deadline is not None and time.monotonic() > deadline:
+                    logger.info(f"Search timed out after {time_limit}s | Expanded: {expanded}")
+                    return None
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info(f"Search cancelled | Expanded: {expanded}")
+                    return None
+
+            _, _, g, state = heapq.heappop(frontier)
+            if self.goals <= state[1]:
+                return self.path_to(state, parents)
+            if g > costs[state]:
+                continue
+
+            for move, child in self.successors(state):
+                child_g = g + 1
+                if child in costs and costs[child] <= child_g:
+                    continue
+                costs[child] = child_g
+                parents[child] = (state, move)
+                h = self.heuristic(child[1])
+                heapq.heappush(frontier, (h if greedy else child_g + h, next(tie), child_g, child))
+        return None
+
+    @staticmethod
+    def path_to(state, parents) -> str:
+        moves = []
+        while parents[state] is not None:
+            state, move = parents[state]
+            moves.append(move)
+        return "".join(reversed(moves))
+
+
+def solve_greedy(data_file, time_limit: float | None = None, cancel_event=None) -> str | None:
+    return SokobanSearch(data_file).solve(greedy=True, time_limit=time_limit, cancel_event=cancel_event)
+
+
+def solve_astar(data_file, time_limit: float | None = None, cancel_event=None) -> str | None:
+    return SokobanSearch(data_file).solve(greedy=False, time_limit=time_limit, cancel_event=cancel_event)